@@ -7,7 +7,9 @@ from locust.rpc import Message, zmqrpc
 import argparse
 import ast
 import atexit
+import copy
 import difflib
+import functools
 import json
 import os
 import platform
@@ -896,13 +898,42 @@ Typically ONLY these options (and --locustfile) need to be specified on workers,
 
 
 def get_parser(default_config_files=DEFAULT_CONFIG_FILES) -> LocustArgumentParser:
+    # Building the parser is fairly expensive, and it is needed every time the web UI index page is rendered,
+    # so reuse it as long as the registered init_command_line_parser listeners haven't changed.
+    # LOCUST_USER_CLASSES is part of the key because it is read when the arguments are set up.
+    # Note that this means init_command_line_parser only fires when a parser is built, not on every call.
+    key = (
+        tuple(default_config_files),
+        tuple(locust.events.init_command_line_parser._handlers),
+        os.environ.get("LOCUST_USER_CLASSES", ""),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        # some listener can't be hashed (e.g. it defines __eq__ but not __hash__), so it can't be cached either
+        parser, list_defaults = _build_parser.__wrapped__(*key)
+    else:
+        parser, list_defaults = _build_parser(*key)
+    # the cached parser is shared, so give each caller its own copy of every list default
+    # (taken when the parser was built, since an earlier caller may have mutated the current ones)
+    parser.set_defaults(**copy.deepcopy(list_defaults))
+    return parser
+
+
+@functools.lru_cache(maxsize=8)
+def _build_parser(
+    default_config_files: tuple[str, ...], _listeners: tuple, _user_classes_env: str
+) -> tuple[LocustArgumentParser, dict[str, list]]:
     # get a parser that is only able to parse the -f argument
-    parser = get_empty_argument_parser(add_help=True, default_config_files=default_config_files)
+    parser = get_empty_argument_parser(add_help=True, default_config_files=list(default_config_files))
     # add all the other supported arguments
     setup_parser_arguments(parser)
     # fire event to provide a hook for locustscripts and plugins to add command line arguments
     locust.events.init_command_line_parser.fire(parser=parser)
-    return parser
+    list_defaults = {
+        action.dest: copy.deepcopy(action.default) for action in parser._actions if isinstance(action.default, list)
+    }
+    return parser, list_defaults
 
 
 def parse_options(args=None) -> configargparse.Namespace:
@@ -923,6 +954,12 @@ def default_args_dict() -> dict:
     return vars(default_parser.parse([]))
 
 
+@functools.cache
+def default_arg_names() -> frozenset[str]:
+    # the set of built-in argument names never changes, so there is no need to rebuild a parser every time
+    return frozenset(default_args_dict())
+
+
 class UIExtraArgOptions(NamedTuple):
     default_value: str
     is_secret: bool
@@ -934,7 +971,7 @@ class UIExtraArgOptions(NamedTuple):
 
 def ui_extra_args_dict(args=None) -> dict[str, dict[str, Any]]:
     """Get all the UI visible arguments"""
-    locust_args = default_args_dict()
+    locust_args = default_arg_names()
 
     parser = get_parser()
     all_args = vars(parser.parse_args(args))
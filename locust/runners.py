@@ -103,6 +103,7 @@ class Runner:
         self.user_greenlets = Group()
         self.greenlet = Group()
         self.state = STATE_INIT
+        self.state_changed = Event()  # set on every state transition, clear it before waiting for the next one
         self.spawning_greenlet: gevent.Greenlet | None = None
         self.shape_greenlet: gevent.Greenlet | None = None
         self.shape_last_tick: tuple[int, float] | tuple[int, float, list[type[User]] | None] | None = None
@@ -202,6 +203,7 @@ class Runner:
         # Uncomment it if you are specifically debugging state transitions
         # logger.debug("Updating state to '%s', old state was '%s'" % (new_state, self.state))
         self.state = new_state
+        self.state_changed.set()
 
     def cpu_log_warning(self) -> bool:
         """Called at the end of the test"""
@@ -420,10 +422,12 @@ class Runner:
 
     def log_exception(self, node_id: str, msg: str, formatted_tb: str) -> None:
         key = hash(formatted_tb)
-        row = self.exceptions.setdefault(key, {"count": 0, "msg": msg, "traceback": formatted_tb, "nodes": set()})
+        row = self.exceptions.get(key)
+        if row is None:
+            # only build the row on first occurrence, setdefault() would allocate a new dict and set every time
+            row = self.exceptions[key] = {"count": 0, "msg": msg, "traceback": formatted_tb, "nodes": set()}
         row["count"] += 1
         row["nodes"].add(node_id)
-        self.exceptions[key] = row
 
     def register_message(self, msg_type: str, listener: Callable, concurrent=False) -> None:
         """
@@ -1389,7 +1393,7 @@ class WorkerRunner(DistributedRunner):
                 custom_args_from_master = {
                     k: v
                     for k, v in job["parsed_options"].items()
-                    if k not in argument_parser.default_args_dict()
+                    if k not in argument_parser.default_arg_names()
                     # these settings are sometimes needed on workers
                     or k in ["expect_workers", "tags", "exclude_tags"]
                 }
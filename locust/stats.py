@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import csv
 import hashlib
+import io
 import json
 import logging
 import os
@@ -23,7 +24,7 @@ from .util.rounding import proper_round
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable
     from types import FrameType
-    from typing import Any
+    from typing import Any, TextIO
 
     from .env import Environment
     from .event import Events
@@ -45,6 +46,9 @@ class CSVWriter(Protocol):
     @abstractmethod
     def writerow(self, columns: Iterable[str | int | float]) -> None: ...
 
+    @abstractmethod
+    def writerows(self, rows: Iterable[Iterable[str | int | float]]) -> None: ...
+
 
 class StatsBaseDict(TypedDict):
     name: str
@@ -120,6 +124,33 @@ PERCENTILES_TO_REPORT = [0.50, 0.66, 0.75, 0.80, 0.90, 0.95, 0.98, 0.99, 0.999,
 PERCENTILES_TO_STATISTICS = [0.95, 0.99]
 PERCENTILES_TO_CHART = [0.5, 0.95]
 
+"""CSV headers. The requests and stats history files also get one column per reported percentile."""
+REQUEST_STATS_CSV_HEADER = (
+    "Type",
+    "Name",
+    "Request Count",
+    "Failure Count",
+    "Median Response Time",
+    "Average Response Time",
+    "Min Response Time",
+    "Max Response Time",
+    "Average Content Size",
+    "Requests/s",
+    "Failures/s",
+)
+STATS_HISTORY_CSV_HEADER = ("Timestamp", "User Count", "Type", "Name", "Requests/s", "Failures/s")
+STATS_HISTORY_CSV_TOTALS_HEADER = (
+    "Total Request Count",
+    "Total Failure Count",
+    "Total Median Response Time",
+    "Total Average Response Time",
+    "Total Min Response Time",
+    "Total Max Response Time",
+    "Total Average Content Size",
+)
+FAILURES_CSV_HEADER = ("Method", "Name", "Error", "Occurrences", "First Seen", "Last Seen")
+EXCEPTIONS_CSV_HEADER = ("Count", "Message", "Traceback", "Nodes")
+
 
 def bucket_response_time(response_time: int | float) -> int:
     """Round response time to reduce unique histogram keys.
@@ -179,6 +210,32 @@ def calculate_response_time_percentile(response_times: dict[int, int], num_reque
     return 0
 
 
+def calculate_response_time_percentiles(
+    response_times: dict[int, int], num_requests: int, percents: Iterable[float]
+) -> list[int]:
+    """
+    Same as calculate_response_time_percentile, but for several percentiles at once. The response
+    times are only sorted and walked through once, instead of once per percentile.
+    """
+    percents = list(percents)
+    results = dict.fromkeys(percents, 0)
+    # higher percentiles are reached first when walking from the slowest response time
+    pending = sorted(results, reverse=True)
+    processed_count = 0
+    for response_time in sorted(response_times.keys(), reverse=True):
+        processed_count += response_times[response_time]
+        while pending and num_requests - processed_count <= int(num_requests * pending[0]):
+            results[pending.pop(0)] = response_time
+        if not pending:
+            break
+    return [results[percent] for percent in percents]
+
+
+def _merge_counts(target: dict[int, int], source: dict[int, int]) -> None:
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + count
+
+
 def diff_response_time_dicts(latest: dict[int, int], old: dict[int, int]) -> dict[int, int]:
     """
     Returns the delta between two {response_times:request_count} dicts.
@@ -348,6 +405,8 @@ class StatsEntry:
         """ Time of the first request for this entry """
         self.last_request_timestamp: float | None = None
         """ Time of the last request for this entry """
+        self._dict_cache: tuple[tuple, dict[str, int | float | str]] | None = None
+        """ to_dict() output together with the key of the state it was computed from """
         self.reset()
 
     def reset(self):
@@ -521,12 +580,9 @@ class StatsEntry:
             self.min_response_time = other.min_response_time
         self.total_content_length += other.total_content_length
 
-        for key in other.response_times:
-            self.response_times[key] = self.response_times.get(key, 0) + other.response_times[key]
-        for key in other.num_reqs_per_sec:
-            self.num_reqs_per_sec[key] = self.num_reqs_per_sec.get(key, 0) + other.num_reqs_per_sec[key]
-        for key in other.num_fail_per_sec:
-            self.num_fail_per_sec[key] = self.num_fail_per_sec.get(key, 0) + other.num_fail_per_sec[key]
+        _merge_counts(self.response_times, other.response_times)
+        _merge_counts(self.num_reqs_per_sec, other.num_reqs_per_sec)
+        _merge_counts(self.num_fail_per_sec, other.num_fail_per_sec)
 
         if self.use_response_times_cache:
             # If we've entered a new second, we'll cache the response times. Note that there
@@ -610,12 +666,29 @@ class StatsEntry:
             self.response_times, self.num_requests - self.num_none_requests, percent
         )
 
+    def get_response_time_percentiles(self, percents: Iterable[float]) -> list[int]:
+        """
+        Get the response times for several percentiles, in the same order as percents.
+        Cheaper than calling get_response_time_percentile() once per percentile.
+        """
+        return calculate_response_time_percentiles(
+            self.response_times, self.num_requests - self.num_none_requests, percents
+        )
+
     def get_current_response_time_percentile(self, percent: float) -> int | None:
         """
         Calculate the *current* response time for a certain percentile. We use a sliding
         window of (approximately) the last 10 seconds (specified by CURRENT_RESPONSE_TIME_PERCENTILE_WINDOW)
         when calculating this.
         """
+        percentiles = self.get_current_response_time_percentiles([percent])
+        return percentiles[0] if percentiles is not None else None
+
+    def get_current_response_time_percentiles(self, percents: Iterable[float]) -> list[int] | None:
+        """
+        Same as get_current_response_time_percentile, but for several percentiles at once (in the same
+        order as percents), so the windowed response times only have to be computed once.
+        """
         if not self.use_response_times_cache:
             raise ValueError(
                 "StatsEntry.use_response_times_cache must be set to True to calculate the _current_ response time percentile"
@@ -644,12 +717,12 @@ class StatsEntry:
         if cached:
             # If we found an acceptable cached response times, we'll calculate a new response
             # times dict of the last 10 seconds (approximately) by diffing it with the current
-            # total response times. Then we'll use that to calculate a response time percentile
+            # total response times. Then we'll use that to calculate the response time percentiles
             # for that timeframe
-            return calculate_response_time_percentile(
+            return calculate_response_time_percentiles(
                 diff_response_time_dicts(self.response_times, cached.response_times),
                 (self.num_requests - self.num_none_requests) - (cached.num_requests - cached.num_none_requests),
-                percent,
+                percents,
             )
         # if time was not in response times cache window
         return None
@@ -662,7 +735,7 @@ class StatsEntry:
 
         return tpl % (
             (self.method or "", self.name)
-            + tuple(self.get_response_time_percentile(p) for p in PERCENTILES_TO_REPORT)
+            + tuple(self.get_response_time_percentiles(PERCENTILES_TO_REPORT))
             + (self.num_requests,)
         )
 
@@ -688,12 +761,27 @@ class StatsEntry:
                 self.response_times_cache.popitem(last=False)
 
     def to_dict(self, escape_string_values=False) -> dict[str, int | float | str]:
+        # Every field depends only on these values, so while no new requests are logged (e.g. the web UI
+        # polling after a test has stopped) the cached dict can be handed out without recomputing percentiles
+        cache_key = (
+            self.num_requests,
+            self.num_failures,
+            self.start_time,
+            self.stats.start_time,
+            self.stats.last_request_timestamp,
+            tuple(PERCENTILES_TO_STATISTICS),
+        )
+        if self._dict_cache is not None and self._dict_cache[0] == cache_key:
+            return dict(self._dict_cache[1])
+
         response_time_percentiles = {
-            f"response_time_percentile_{percentile}": self.get_response_time_percentile(percentile)
-            for percentile in PERCENTILES_TO_STATISTICS
+            f"response_time_percentile_{percentile}": value
+            for percentile, value in zip(
+                PERCENTILES_TO_STATISTICS, self.get_response_time_percentiles(PERCENTILES_TO_STATISTICS)
+            )
         }
 
-        return {
+        result = {
             "method": self.method,
             "name": self.name,
             "num_requests": self.num_requests,
@@ -709,6 +797,8 @@ class StatsEntry:
             **response_time_percentiles,
             "avg_content_length": self.avg_content_length,
         }
+        self._dict_cache = (cache_key, result)
+        return dict(result)
 
 
 class StatsError:
@@ -1007,43 +1097,20 @@ class StatsCSV:
 
         self.percentiles_na = ["N/A"] * len(self.percentiles_to_report)
 
-        self.requests_csv_columns = [
-            "Type",
-            "Name",
-            "Request Count",
-            "Failure Count",
-            "Median Response Time",
-            "Average Response Time",
-            "Min Response Time",
-            "Max Response Time",
-            "Average Content Size",
-            "Requests/s",
-            "Failures/s",
-        ] + get_readable_percentiles(self.percentiles_to_report)
-
-        self.failures_columns = [
-            "Method",
-            "Name",
-            "Error",
-            "Occurrences",
-            "First Seen",
-            "Last Seen",
-        ]
-
-        self.exceptions_columns = [
-            "Count",
-            "Message",
-            "Traceback",
-            "Nodes",
-        ]
+        self.requests_csv_columns = REQUEST_STATS_CSV_HEADER + tuple(
+            get_readable_percentiles(self.percentiles_to_report)
+        )
+        self.failures_columns = FAILURES_CSV_HEADER
+        self.exceptions_columns = EXCEPTIONS_CSV_HEADER
 
     def _percentile_fields(self, stats_entry: StatsEntry, use_current: bool = False) -> list[str] | list[int]:
         if not stats_entry.num_requests:
             return self.percentiles_na
         elif use_current:
-            return [int(stats_entry.get_current_response_time_percentile(x) or 0) for x in self.percentiles_to_report]
+            percentiles = stats_entry.get_current_response_time_percentiles(self.percentiles_to_report)
+            return [int(x or 0) for x in percentiles] if percentiles else [0] * len(self.percentiles_to_report)
         else:
-            return [int(stats_entry.get_response_time_percentile(x) or 0) for x in self.percentiles_to_report]
+            return [int(x or 0) for x in stats_entry.get_response_time_percentiles(self.percentiles_to_report)]
 
     def requests_csv(self, csv_writer: CSVWriter) -> None:
         """Write requests csv with header and data rows."""
@@ -1053,42 +1120,40 @@ class StatsCSV:
     def _requests_data_rows(self, csv_writer: CSVWriter) -> None:
         """Write requests csv data row, excluding header."""
         stats = self.environment.stats
-        for stats_entry in chain(sort_stats(stats.entries), [stats.total]):
-            csv_writer.writerow(
-                chain(
-                    [
-                        stats_entry.method,
-                        stats_entry.name,
-                        stats_entry.num_requests,
-                        stats_entry.num_failures,
-                        stats_entry.median_response_time,
-                        stats_entry.avg_response_time,
-                        stats_entry.min_response_time or 0,
-                        stats_entry.max_response_time,
-                        stats_entry.avg_content_length,
-                        stats_entry.total_rps,
-                        stats_entry.total_fail_per_sec,
-                    ],
-                    self._percentile_fields(stats_entry),
-                )
+        csv_writer.writerows(
+            (
+                stats_entry.method,
+                stats_entry.name,
+                stats_entry.num_requests,
+                stats_entry.num_failures,
+                stats_entry.median_response_time,
+                stats_entry.avg_response_time,
+                stats_entry.min_response_time or 0,
+                stats_entry.max_response_time,
+                stats_entry.avg_content_length,
+                stats_entry.total_rps,
+                stats_entry.total_fail_per_sec,
+                *self._percentile_fields(stats_entry),
             )
+            for stats_entry in chain(sort_stats(stats.entries), [stats.total])
+        )
 
     def failures_csv(self, csv_writer: CSVWriter) -> None:
         csv_writer.writerow(self.failures_columns)
         self._failures_data_rows(csv_writer)
 
     def _failures_data_rows(self, csv_writer: CSVWriter) -> None:
-        for stats_error in sort_stats(self.environment.stats.errors):
-            csv_writer.writerow(
-                [
-                    stats_error.method,
-                    stats_error.name,
-                    StatsError.parse_error(stats_error.error),
-                    stats_error.occurrences,
-                    format_utc_timestamp(stats_error.first_seen) if stats_error.first_seen is not None else "",
-                    format_utc_timestamp(stats_error.last_seen) if stats_error.last_seen is not None else "",
-                ]
+        csv_writer.writerows(
+            (
+                stats_error.method,
+                stats_error.name,
+                StatsError.parse_error(stats_error.error),
+                stats_error.occurrences,
+                format_utc_timestamp(stats_error.first_seen) if stats_error.first_seen is not None else "",
+                format_utc_timestamp(stats_error.last_seen) if stats_error.last_seen is not None else "",
             )
+            for stats_error in sort_stats(self.environment.stats.errors)
+        )
 
     def exceptions_csv(self, csv_writer: CSVWriter) -> None:
         csv_writer.writerow(self.exceptions_columns)
@@ -1098,8 +1163,10 @@ class StatsCSV:
         if self.environment.runner is None:
             return
 
-        for exc in self.environment.runner.exceptions.values():
-            csv_writer.writerow([exc["count"], exc["msg"], exc["traceback"], ", ".join(exc["nodes"])])
+        csv_writer.writerows(
+            (exc["count"], exc["msg"], exc["traceback"], ", ".join(exc["nodes"]))
+            for exc in self.environment.runner.exceptions.values()
+        )
 
 
 class StatsCSVFileWriter(StatsCSV):
@@ -1130,22 +1197,15 @@ class StatsCSVFileWriter(StatsCSV):
         self.exceptions_csv_writer = csv.writer(self.exceptions_csv_filehandle)
         self.exceptions_csv_data_start: int = 0
 
-        self.stats_history_csv_columns = [
-            "Timestamp",
-            "User Count",
-            "Type",
-            "Name",
-            "Requests/s",
-            "Failures/s",
+        # data rows are rendered into this reused buffer, so that each file gets them in a single write
+        self._rows_buffer = io.StringIO()
+        self._rows_buffer_writer = csv.writer(self._rows_buffer)
+
+        self.stats_history_csv_columns = (
+            *STATS_HISTORY_CSV_HEADER,
             *get_readable_percentiles(self.percentiles_to_report),
-            "Total Request Count",
-            "Total Failure Count",
-            "Total Median Response Time",
-            "Total Average Response Time",
-            "Total Min Response Time",
-            "Total Max Response Time",
-            "Total Average Content Size",
-        ]
+            *STATS_HISTORY_CSV_TOTALS_HEADER,
+        )
 
     def __call__(self) -> None:
         self.stats_writer()
@@ -1172,17 +1232,20 @@ class StatsCSVFileWriter(StatsCSV):
                 now = time.time()
 
                 self.requests_csv_filehandle.seek(requests_csv_data_start)
-                self._requests_data_rows(self.requests_csv_writer)
+                self._write_buffered_rows(self.requests_csv_filehandle, self._requests_data_rows)
                 self.requests_csv_filehandle.truncate()
 
-                self._stats_history_data_rows(self.stats_history_csv_writer, now)
+                self._write_buffered_rows(
+                    self.stats_history_csv_filehandle,
+                    lambda csv_writer: self._stats_history_data_rows(csv_writer, now),
+                )
 
                 self.failures_csv_filehandle.seek(self.failures_csv_data_start)
-                self._failures_data_rows(self.failures_csv_writer)
+                self._write_buffered_rows(self.failures_csv_filehandle, self._failures_data_rows)
                 self.failures_csv_filehandle.truncate()
 
                 self.exceptions_csv_filehandle.seek(self.exceptions_csv_data_start)
-                self._exceptions_data_rows(self.exceptions_csv_writer)
+                self._write_buffered_rows(self.exceptions_csv_filehandle, self._exceptions_data_rows)
                 self.exceptions_csv_filehandle.truncate()
 
                 if now - last_flush_time > CSV_STATS_FLUSH_INTERVAL_SEC:
@@ -1196,6 +1259,13 @@ class StatsCSVFileWriter(StatsCSV):
         except KeyboardInterrupt as e:
             logger.debug(e, exc_info=True)
 
+    def _write_buffered_rows(self, filehandle: TextIO, write_rows: Callable[[CSVWriter], None]) -> None:
+        """Render rows into the reused buffer and write them to filehandle in one go."""
+        write_rows(self._rows_buffer_writer)
+        filehandle.write(self._rows_buffer.getvalue())
+        self._rows_buffer.seek(0)
+        self._rows_buffer.truncate()
+
     def _stats_history_data_rows(self, csv_writer: CSVWriter, now: float) -> None:
         """
         Write CSV rows with the *current* stats. By default only includes the
@@ -1211,29 +1281,26 @@ class StatsCSVFileWriter(StatsCSV):
         if self.full_history:
             stats_entries = sort_stats(stats.entries)
 
-        for stats_entry in chain(stats_entries, [stats.total]):
-            csv_writer.writerow(
-                chain(
-                    (
-                        timestamp,
-                        self.environment.runner.user_count if self.environment.runner is not None else 0,
-                        stats_entry.method or "",
-                        stats_entry.name,
-                        f"{stats_entry.current_rps:2f}",
-                        f"{stats_entry.current_fail_per_sec:2f}",
-                    ),
-                    self._percentile_fields(stats_entry, use_current=self.full_history),
-                    (
-                        stats_entry.num_requests,
-                        stats_entry.num_failures,
-                        stats_entry.median_response_time,
-                        stats_entry.avg_response_time,
-                        stats_entry.min_response_time or 0,
-                        stats_entry.max_response_time,
-                        stats_entry.avg_content_length,
-                    ),
-                )
+        user_count = self.environment.runner.user_count if self.environment.runner is not None else 0
+        csv_writer.writerows(
+            (
+                timestamp,
+                user_count,
+                stats_entry.method or "",
+                stats_entry.name,
+                f"{stats_entry.current_rps:2f}",
+                f"{stats_entry.current_fail_per_sec:2f}",
+                *self._percentile_fields(stats_entry, use_current=self.full_history),
+                stats_entry.num_requests,
+                stats_entry.num_failures,
+                stats_entry.median_response_time,
+                stats_entry.avg_response_time,
+                stats_entry.min_response_time or 0,
+                stats_entry.max_response_time,
+                stats_entry.avg_content_length,
             )
+            for stats_entry in chain(stats_entries, [stats.total])
+        )
 
     def requests_flush(self) -> None:
         self.requests_csv_filehandle.flush()
@@ -5,6 +5,7 @@ from locust.argument_parser import (
     ui_extra_args_dict,
 )
 
+import dataclasses
 import os
 import unittest
 from io import StringIO
@@ -327,6 +328,51 @@ class TestArgumentParser(LocustTestCase):
         stderr = err.read()
         self.assertIn("Did you mean '--print-stats'", stderr)
 
+    def test_get_parser_rebuilt_when_listeners_or_user_classes_env_change(self):
+        with mock.patch.dict(os.environ, {"LOCUST_USER_CLASSES": ""}):
+            parser = get_parser(default_config_files=[])
+            self.assertIs(parser, get_parser(default_config_files=[]))
+
+        with mock.patch.dict(os.environ, {"LOCUST_USER_CLASSES": "MyUser"}):
+            env_parser = get_parser(default_config_files=[])
+        self.assertIsNot(parser, env_parser)
+
+        @locust.events.init_command_line_parser.add_listener
+        def _(parser, **kw):
+            parser.add_argument("--my-argument")
+
+        with mock.patch.dict(os.environ, {"LOCUST_USER_CLASSES": ""}):
+            listener_parser = get_parser(default_config_files=[])
+        self.assertIsNot(parser, listener_parser)
+        self.assertIsNone(listener_parser.parse_args([]).my_argument)
+
+    def test_parsed_options_do_not_share_default_lists(self):
+        with mock.patch.dict(os.environ, {"LOCUST_USER_CLASSES": "MyUser"}):
+            options = get_parser(default_config_files=[]).parse_args([])
+            options.user_classes.append("Leak")
+            self.assertEqual(["MyUser"], get_parser(default_config_files=[]).parse_args([]).user_classes)
+
+    def test_parsed_options_do_not_share_listener_list_defaults(self):
+        @locust.events.init_command_line_parser.add_listener
+        def _(parser, **kw):
+            parser.add_argument("--endpoints", choices=["a", "b", "c"], is_multiple=True, default=["a"])
+
+        options = get_parser(default_config_files=[]).parse_args([])
+        options.endpoints.append("b")
+        get_parser(default_config_files=[]).parse_args([]).endpoints.append("c")
+        self.assertEqual(["a"], get_parser(default_config_files=[]).parse_args([]).endpoints)
+
+    def test_get_parser_with_unhashable_listener(self):
+        @dataclasses.dataclass
+        class Listener:
+            default: str
+
+            def __call__(self, parser, **kw):
+                parser.add_argument("--unhashable-arg", default=self.default)
+
+        locust.events.init_command_line_parser.add_listener(Listener("hej"))
+        self.assertEqual("hej", get_parser(default_config_files=[]).parse_args([]).unhashable_arg)
+
     def test_custom_argument(self):
         @locust.events.init_command_line_parser.add_listener
         def _(parser, **kw):
@@ -153,6 +153,30 @@ class TestRequestStats(unittest.TestCase):
         self.assertEqual(s.get_response_time_percentile(0.6), 60)
         self.assertEqual(s.get_response_time_percentile(0.95), 95)
 
+    def test_percentiles_match_single_percentile(self):
+        s = StatsEntry(self.stats, "percentile_test", "GET")
+        for x in range(0, 2000, 7):
+            s.log(x, 0)
+        s.log(None, 0)
+
+        percents = [0.95, 0.1, 0.5, 1.0, 0.999, 0.5]
+        self.assertEqual(
+            [s.get_response_time_percentile(p) for p in percents], s.get_response_time_percentiles(percents)
+        )
+        self.assertEqual([0, 0], StatsEntry(self.stats, "empty", "GET").get_response_time_percentiles([0.5, 0.95]))
+
+    def test_to_dict_cache_invalidated_by_new_requests(self):
+        s = StatsEntry(self.stats, "to_dict_test", "GET")
+        s.log(100, 0)
+        first = s.to_dict()
+        self.assertEqual(first, s.to_dict())
+        self.assertIsNot(first, s.to_dict())
+
+        s.log(300, 0)
+        second = s.to_dict()
+        self.assertEqual(2, second["num_requests"])
+        self.assertEqual(300, second["max_response_time"])
+
     def test_median(self):
         self.assertEqual(self.s.median_response_time, 79)
 
@@ -794,6 +818,23 @@ class TestStatsEntryResponseTimesCache(unittest.TestCase):
 
         self.assertEqual(95, s.get_current_response_time_percentile(0.95))
 
+    def test_get_current_response_time_percentiles(self):
+        s = StatsEntry(self.stats, "/", "GET", use_response_times_cache=True)
+        t = int(time.time())
+        s.response_times_cache[t - 10] = CachedResponseTimes(
+            response_times={i: 1 for i in range(100)}, num_requests=100, num_none_requests=0
+        )
+
+        s.response_times = {i: 2 for i in range(100)}
+        s.num_requests = 200
+
+        percents = [0.5, 0.95, 0.99]
+        self.assertEqual(
+            [s.get_current_response_time_percentile(p) for p in percents],
+            s.get_current_response_time_percentiles(percents),
+        )
+        self.assertEqual([50, 95, 99], s.get_current_response_time_percentiles(percents))
+
     def test_get_current_response_time_percentile_outside_cache_window(self):
         s = StatsEntry(self.stats, "/", "GET", use_response_times_cache=True)
         # an empty response times cache, current time will not be in this cache
@@ -1,8 +1,10 @@
+from locust.util.cache import memoize
 from locust.util.rounding import proper_round
 from locust.util.timespan import parse_timespan
 from locust.util.url import is_url
 
 import unittest
+from unittest import mock
 
 
 class TestParseTimespan(unittest.TestCase):
@@ -54,3 +56,34 @@ class TestRounding(unittest.TestCase):
         self.assertEqual(1.0, proper_round(1, 2))
         self.assertEqual(5.0, proper_round(5, 2))
         self.assertEqual(9.0, proper_round(9, 2))
+
+
+class TestMemoize(unittest.TestCase):
+    def test_result_is_cached_until_timeout(self):
+        calls = []
+
+        @memoize(timeout=2)
+        def func():
+            calls.append(1)
+            return len(calls)
+
+        with mock.patch("locust.util.cache.monotonic", return_value=100.0) as mocked_time:
+            self.assertEqual(1, func())
+            self.assertEqual(1, func())
+            mocked_time.return_value = 101.9
+            self.assertEqual(1, func())
+            mocked_time.return_value = 102.1
+            self.assertEqual(2, func())
+
+    def test_clear_cache(self):
+        calls = []
+
+        @memoize(timeout=60)
+        def func():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(1, func())
+        func.clear_cache()
+        self.assertEqual(2, func())
+        self.assertEqual(2, func())
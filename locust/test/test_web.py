@@ -1,31 +1,74 @@
 from __future__ import annotations
 
 import locust
-from locust import LoadTestShape, constant, stats
+from locust import LoadTestShape, constant, stats, web
 from locust.argument_parser import get_parser
 from locust.env import Environment
 from locust.log import LogReader
-from locust.runners import Runner
+from locust.runners import STATE_RUNNING, STATE_STOPPED, Runner
 from locust.stats import StatsCSVFileWriter
 from locust.user import User, task
 from locust.web import WebUI
 
+import argparse
+import copy
 import csv
+import gzip
 import json
 import logging
 import os
+import re
 import traceback
 from io import StringIO
 from tempfile import NamedTemporaryFile
+from unittest import mock
 
 import gevent
+import orjson
 import requests
 from flask_login import UserMixin
-from pyquery import PyQuery as pq
+from requests.adapters import HTTPAdapter
 
 from .testcases import LocustTestCase
 from .util import create_tls_cert
 
+_NUM_USERS_RE = re.compile(r'"num_users":\s*100')
+_SPAWN_RATE_RE = re.compile(r'"spawn_rate":\s*10\.0')
+
+
+class User1(User):
+    wait_time = constant(1)
+
+    @task
+    def t(self):
+        pass
+
+
+class User2(User):
+    wait_time = constant(1)
+
+    @task
+    def t(self):
+        pass
+
+
+class Shape1(LoadTestShape):
+    def tick(self):
+        run_time = self.get_run_time()
+        if run_time < 10:
+            return 4, 4
+        else:
+            return None
+
+
+class Shape2(Shape1):
+    pass
+
+
+class NoopShape(LoadTestShape):
+    def tick(self):
+        pass
+
 
 class _HeaderCheckMixin:
     def _check_csv_headers(self, headers, exp_fn_prefix):
@@ -41,33 +84,140 @@ class _HeaderCheckMixin:
         self.assertIn(exp_fn_prefix, disposition)
 
 
-class TestWebUI(LocustTestCase, _HeaderCheckMixin):
+class _SessionMixin:
+    """
+    One requests.Session per test class, so tests reuse keep-alive connections instead of
+    opening new ones for every request. Cookies are cleared between tests so logins don't leak.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        cls.session.mount("http://", adapter)
+        cls.session.mount("https://", adapter)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        super().tearDownClass()
+
     def setUp(self):
         super().setUp()
+        self.session.cookies.clear()
 
-        parser = get_parser(default_config_files=[])
-        self.environment.parsed_options = parser.parse_args([])
+
+class _DefaultOptionsMixin:
+    """
+    Parses the default options once per test class (after setUp has reset the event hooks) and hands
+    each test its own copy, list values included, so tests are free to modify it.
+    """
+
+    _option_args: list[str] = []
+    _base_options: argparse.Namespace | None = None
+
+    @classmethod
+    def _default_options(cls):
+        if cls._base_options is None:
+            cls._base_options = get_parser(default_config_files=[]).parse_args(cls._option_args)
+        options = copy.copy(cls._base_options)
+        for key, value in vars(options).items():
+            if isinstance(value, list):
+                setattr(options, key, list(value))
+        return options
+
+
+class _TestClientResponse:
+    """The parts of requests.Response the tests use, for a Flask test client response"""
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = response.data
+        if response.headers.get("Content-Encoding") == "gzip":
+            # requests hands out the decoded body, so do the same
+            self.content = gzip.decompress(self.content)
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _TestClientSession:
+    """
+    Drop-in for the requests.Session used by the tests that dispatches requests to the Flask app
+    in-process. Tests that only check responses use it to skip the loopback socket.
+    """
+
+    def __init__(self, app):
+        self._client = app.test_client()
+
+    def get(self, url, headers=None):
+        return _TestClientResponse(self._client.get(url, headers=headers, follow_redirects=True))
+
+    def post(self, url, data=None, json=None):
+        return _TestClientResponse(self._client.post(url, data=data, json=json, follow_redirects=True))
+
+
+class TestWebUI(_SessionMixin, _DefaultOptionsMixin, LocustTestCase, _HeaderCheckMixin):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.log_reader = LogReader()
+        cls.log_reader.name = "log_reader"
+        cls.log_reader.setLevel(logging.INFO)
+
+    def setUp(self):
+        super().setUp()
+        # LocustTestCase.setUp swaps out the root handlers, so the shared log reader is (re)attached per test
+        self.log_reader.logs.clear()
+        logging.getLogger("root").addHandler(self.log_reader)
+
+        self.environment.parsed_options = self._default_options()
         self.stats = self.environment.stats
 
         self.web_ui = self.environment.create_web_ui("127.0.0.1", 0)
         self.web_ui.app.view_functions["locust.request_stats"].clear_cache()
-        gevent.sleep(0.01)
+        # a single yield is enough for the server greenlet to bind its socket and start accepting
+        gevent.sleep(0)
         self.web_port = self.web_ui.server.server_port
+        self.url = f"http://127.0.0.1:{self.web_port}"
+        self.client = _TestClientSession(self.web_ui.app)
 
     def tearDown(self):
+        logging.getLogger("root").removeHandler(self.log_reader)
         super().tearDown()
         self.web_ui.stop()
         self.runner.quit()
 
+    def _wait_for_runner_state(self, state, timeout=2):
+        with gevent.Timeout(timeout):
+            while self.runner.state != state:
+                self.runner.state_changed.clear()
+                self.runner.state_changed.wait()
+
+    def _log_test_exception(self, message, times):
+        try:
+            raise Exception(message)
+        except Exception as e:
+            # format the traceback once, every occurrence of the exception shares it
+            tb = "".join(traceback.format_tb(e.__traceback__))
+            for _ in range(times):
+                self.runner.log_exception("local", str(e), tb)
+
     def test_web_ui_reference_on_environment(self):
         self.assertEqual(self.web_ui, self.environment.web_ui)
 
     def test_web_ui_no_runner(self):
         env = Environment()
         web_ui = WebUI(env, "127.0.0.1", 0)
-        gevent.sleep(0.01)
+        gevent.sleep(0)
         try:
-            response = requests.get("http://127.0.0.1:%i/" % web_ui.server.server_port)
+            response = self.session.get(f"http://127.0.0.1:{web_ui.server.server_port}/")
             self.assertEqual(500, response.status_code)
             self.assertEqual("Error: Locust Environment does not have any runner", response.text)
         finally:
@@ -76,53 +226,47 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
     def test_index(self):
         self.assertEqual(self.web_ui, self.environment.web_ui)
 
-        html_to_option = {
-            "num_users": ["-u", "100"],
-            "spawn_rate": ["-r", "10.0"],
-        }
+        option_to_pattern = (
+            (["-u", "100"], _NUM_USERS_RE),
+            (["-r", "10.0"], _SPAWN_RATE_RE),
+        )
 
-        response = requests.get("http://127.0.0.1:%i/" % self.web_port)
-        d = pq(response.content.decode("utf-8"))
+        response = self.client.get(f"{self.url}/")
+        body = response.content.decode("utf-8")
 
         self.assertEqual(200, response.status_code)
-        self.assertTrue(d("#root"))
+        self.assertIn('id="root"', body)
 
-        for html_name_to_test in html_to_option.keys():
+        for option, pattern in option_to_pattern:
             # Test that setting each spawn option individually populates the corresponding field in the html, and none of the others
-            self.environment.parsed_options = get_parser().parse_args(html_to_option[html_name_to_test])
+            self.environment.parsed_options = get_parser().parse_args(option)
 
-            response = requests.get("http://127.0.0.1:%i/" % self.web_port)
+            response = self.client.get(f"{self.url}/")
             self.assertEqual(200, response.status_code)
-
-            d = pq(response.content.decode("utf-8"))
-
-            self.assertIn(f'"{html_name_to_test}": {html_to_option[html_name_to_test][1]}', str(d("script")))
+            self.assertRegex(response.text, pattern)
 
     def test_index_with_spawn_options(self):
-        html_to_option = {
-            "num_users": ["-u", "100"],
-            "spawn_rate": ["-r", "10.0"],
-        }
+        option_to_pattern = (
+            (["-u", "100"], _NUM_USERS_RE),
+            (["-r", "10.0"], _SPAWN_RATE_RE),
+        )
 
-        for html_name_to_test in html_to_option.keys():
-            self.environment.parsed_options = get_parser().parse_args(html_to_option[html_name_to_test])
+        for option, pattern in option_to_pattern:
+            self.environment.parsed_options = get_parser().parse_args(option)
 
-            response = requests.get("http://127.0.0.1:%i/" % self.web_port)
+            response = self.client.get(f"{self.url}/")
             self.assertEqual(200, response.status_code)
-
-            d = pq(response.content.decode("utf-8"))
-
-            self.assertIn(f'"{html_name_to_test}": {html_to_option[html_name_to_test][1]}', str(d))
+            self.assertRegex(response.text, pattern)
 
     def test_stats_no_data(self):
-        self.assertEqual(200, requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port).status_code)
+        self.assertEqual(200, self.client.get(f"{self.url}/stats/requests").status_code)
 
     def test_stats(self):
         self.stats.log_request("GET", "/<html>", 120, 5612)
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual(200, response.status_code)
 
-        data = json.loads(response.text)
+        data = orjson.loads(response.content)
         self.assertEqual(2, len(data["stats"]))  # one entry plus Aggregated
         self.assertEqual("/<html>", data["stats"][0]["name"])
         self.assertEqual("GET", data["stats"][0]["method"])
@@ -133,10 +277,10 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
     def test_html_report_uses_total_rps_not_current_rps(self):
         self.stats.log_request("GET", "/test", 100, 1000)
         self.stats.log_request("GET", "/test", 120, 1200)
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual(200, response.status_code)
 
-        data = json.loads(response.text)
+        data = orjson.loads(response.content)
         self.assertIn("total_rps", data)
         self.assertIn("total_fail_per_sec", data)
 
@@ -147,51 +291,101 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
 
     def test_stats_cache(self):
         self.stats.log_request("GET", "/test", 120, 5612)
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual(200, response.status_code)
-        data = json.loads(response.text)
+        data = orjson.loads(response.content)
         self.assertEqual(2, len(data["stats"]))  # one entry plus Aggregated
 
         # add another entry
         self.stats.log_request("GET", "/test2", 120, 5612)
-        data = json.loads(requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port).text)
+        data = orjson.loads(self.client.get(f"{self.url}/stats/requests").content)
         self.assertEqual(2, len(data["stats"]))  # old value should be cached now
 
         self.web_ui.app.view_functions["locust.request_stats"].clear_cache()
 
-        data = json.loads(requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port).text)
+        data = orjson.loads(self.client.get(f"{self.url}/stats/requests").content)
         self.assertEqual(3, len(data["stats"]))  # this should no longer be cached
 
+    def test_stats_same_with_and_without_orjson(self):
+        self.stats.log_request("GET", "/test", 120, 5612)
+        self.stats.log_error("GET", "/test", "some error")
+
+        bodies = []
+        for orjson_module in (web.orjson, None):
+            with mock.patch("locust.web.orjson", orjson_module):
+                self.web_ui.app.view_functions["locust.request_stats"].clear_cache()
+                response = self.client.get(f"{self.url}/stats/requests")
+            self.assertEqual(200, response.status_code)
+            self.assertEqual("application/json", response.headers["Content-Type"])
+            bodies.append(response.json())
+
+        self.assertEqual(bodies[0], bodies[1])
+
+    def test_stats_not_modified(self):
+        self.stats.log_request("GET", "/test", 120, 5612)
+        response = self.client.get(f"{self.url}/stats/requests")
+        self.assertEqual(200, response.status_code)
+        etag = response.headers["ETag"]
+
+        response = self.client.get(f"{self.url}/stats/requests", headers={"If-None-Match": etag})
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.content)
+
+        self.stats.log_request("GET", "/test2", 120, 5612)
+        self.web_ui.app.view_functions["locust.request_stats"].clear_cache()
+
+        response = self.client.get(f"{self.url}/stats/requests", headers={"If-None-Match": etag})
+        self.assertEqual(200, response.status_code)
+        self.assertNotEqual(etag, response.headers["ETag"])
+        self.assertEqual(3, len(response.json()["stats"]))
+
     def test_stats_rounding(self):
         self.stats.log_request("GET", "/test", 1.39764125, 2)
         self.stats.log_request("GET", "/test", 999.9764125, 1000)
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual(200, response.status_code)
 
-        data = json.loads(response.text)
+        data = orjson.loads(response.content)
         self.assertEqual(1, data["stats"][0]["min_response_time"])
         self.assertEqual(1000, data["stats"][0]["max_response_time"])
 
     def test_request_stats_csv(self):
         self.stats.log_request("GET", "/test2", 120, 5612)
-        response = requests.get("http://127.0.0.1:%i/stats/requests/csv" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests/csv")
         self.assertEqual(200, response.status_code)
         self._check_csv_headers(response.headers, "requests")
 
+    def test_request_stats_csv_gzip(self):
+        self.stats.log_request("GET", "/test2", 120, 5612)
+        response = self.client.get(f"{self.url}/stats/requests/csv", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        rows = list(csv.reader(StringIO(response.text)))
+        self.assertEqual("/test2", rows[1][1])
+
+        response = self.client.get(f"{self.url}/stats/requests/csv", headers={"Accept-Encoding": "identity"})
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("Content-Encoding", response.headers)
+
+        for refused in ("gzip;q=0", "*;q=0"):
+            response = self.client.get(f"{self.url}/stats/requests/csv", headers={"Accept-Encoding": refused})
+            self.assertEqual(200, response.status_code)
+            self.assertNotIn("Content-Encoding", response.headers)
+
     def test_request_stats_full_history_csv_not_present(self):
         self.stats.log_request("GET", "/test2", 120, 5612)
-        response = requests.get("http://127.0.0.1:%i/stats/requests_full_history/csv" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests_full_history/csv")
         self.assertEqual(404, response.status_code)
 
     def test_failure_stats_csv(self):
         self.stats.log_error("GET", "/", Exception("Error1337"))
-        response = requests.get("http://127.0.0.1:%i/stats/failures/csv" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/failures/csv")
         self.assertEqual(200, response.status_code)
         self._check_csv_headers(response.headers, "failures")
 
     def test_request_stats_with_errors(self):
         self.stats.log_error("GET", "/", Exception("Error with special characters {'foo':'bar'}"))
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual(200, response.status_code)
 
         # escaped, old school
@@ -203,17 +397,12 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertIn("\"Exception(\\\"Error with special characters {'foo':'bar'}\\\")", response.text)
 
     def test_reset_stats(self):
-        try:
-            raise Exception("A cool test exception")
-        except Exception as e:
-            tb = e.__traceback__
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
+        self._log_test_exception("A cool test exception", times=2)
 
         self.stats.log_request("GET", "/test", 120, 5612)
         self.stats.log_error("GET", "/", Exception("Error1337"))
 
-        response = requests.get("http://127.0.0.1:%i/stats/reset" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/reset")
 
         self.assertEqual(200, response.status_code)
 
@@ -226,29 +415,19 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(0, self.stats.get("/test", "GET").num_failures)
 
     def test_exceptions(self):
-        try:
-            raise Exception("A cool test exception")
-        except Exception as e:
-            tb = e.__traceback__
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
+        self._log_test_exception("A cool test exception", times=2)
 
-        response = requests.get("http://127.0.0.1:%i/exceptions" % self.web_port)
+        response = self.client.get(f"{self.url}/exceptions")
         self.assertEqual(200, response.status_code)
         self.assertIn("A cool test exception", response.text)
 
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual(200, response.status_code)
 
     def test_exceptions_csv(self):
-        try:
-            raise Exception("Test exception")
-        except Exception as e:
-            tb = e.__traceback__
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
+        self._log_test_exception("Test exception", times=2)
 
-        response = requests.get("http://127.0.0.1:%i/exceptions/csv" % self.web_port)
+        response = self.client.get(f"{self.url}/exceptions/csv")
         self.assertEqual(200, response.status_code)
         self._check_csv_headers(response.headers, "exceptions")
 
@@ -268,49 +447,34 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
                 pass
 
         self.environment.user_classes = [MyUser]
-        self.environment.web_ui.parsed_options = get_parser().parse_args()
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        self.environment.web_ui.parsed_options = self._default_options()
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={"user_count": 5, "spawn_rate": 5, "host": "https://localhost"},
         )
         self.assertEqual(200, response.status_code)
         self.assertEqual("https://localhost", response.json()["host"])
         self.assertEqual(self.environment.host, "https://localhost")
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
         # and swarm again, with new host
-        gevent.sleep(1)
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={"user_count": 5, "spawn_rate": 5, "host": "https://localhost/other"},
         )
-        gevent.sleep(1)
+        self._wait_for_runner_state(STATE_RUNNING)
         self.assertEqual(200, response.status_code)
         self.assertEqual("https://localhost/other", response.json()["host"])
         self.assertEqual(self.environment.host, "https://localhost/other")
 
     def test_swarm_userclass_specified(self):
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -325,14 +489,13 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(["User1"], response.json()["user_classes"])
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
         # and swarm again, with new locustfile
-        gevent.sleep(1)
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -340,32 +503,18 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
                 "user_classes": "User2",
             },
         )
-        gevent.sleep(1)
+        self._wait_for_runner_state(STATE_RUNNING)
         self.assertEqual(200, response.status_code)
         self.assertEqual("https://localhost", response.json()["host"])
         self.assertEqual(self.environment.host, "https://localhost")
         self.assertEqual(["User2"], response.json()["user_classes"])
 
     def test_swarm_multiple_userclasses_specified(self):
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -383,8 +532,8 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(self.environment.locustfile, "User1,User2", "Verify locustfile variable used in web ui title")
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_updates_parsed_options_when_single_userclass_specified(self):
@@ -393,25 +542,11 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         when /swarm is hit with 'user_classes' in the data.
         """
 
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -422,8 +557,8 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertListEqual(["User1"], response.json()["user_classes"])
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
         # Checking environment.parsed_options.user_classes was updated
@@ -435,25 +570,11 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         when /swarm is hit with 'user_classes' in the data.
         """
 
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -464,8 +585,8 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertListEqual(["User1", "User2"], response.json()["user_classes"])
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
         # Checking environment.parsed_options.user_classes was updated
@@ -474,24 +595,10 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
     def test_swarm_defaults_to_all_available_userclasses_when_userclass_picker_is_active_and_no_userclass_in_payload(
         self,
     ):
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -505,32 +612,18 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertListEqual(["User1", "User2"], response.json()["user_classes"])
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_uses_pre_selected_user_classes_when_empty_payload_and_test_is_already_running_with_class_picker(
         self,
     ):
         # This test validates that the correct User Classes are used when editing a running test
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -545,8 +638,9 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertListEqual(["User1"], response.json()["user_classes"])
 
         # simulating edit running load test
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 10,
                 "spawn_rate": 10,
@@ -558,14 +652,14 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertListEqual(["User1"], response.json()["user_classes"])
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_error_when_userclass_picker_is_active_but_no_available_userclasses(self):
         self.environment.web_ui.userclass_picker_is_active = True
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -579,43 +673,13 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(expected_error_message, response.json()["message"])
 
     def test_swarm_shape_class_specified(self):
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class TestShape1(LoadTestShape):
-            def tick(self):
-                run_time = self.get_run_time()
-                if run_time < 10:
-                    return 4, 4
-                else:
-                    return None
-
-        class TestShape2(LoadTestShape):
-            def tick(self):
-                run_time = self.get_run_time()
-                if run_time < 10:
-                    return 4, 4
-                else:
-                    return None
-
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
-        self.environment.available_shape_classes = {"TestShape1": TestShape1(), "TestShape2": TestShape2()}
-        self.environment.shape_class = TestShape1()
+        self.environment.available_shape_classes = {"TestShape1": Shape1(), "TestShape2": Shape2()}
+        self.environment.shape_class = Shape1()
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -628,45 +692,23 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(200, response.status_code)
         self.assertEqual("https://localhost", response.json()["host"])
         self.assertEqual(self.environment.host, "https://localhost")
-        assert isinstance(self.environment.shape_class, TestShape2)
+        assert isinstance(self.environment.shape_class, Shape2)
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_shape_class_defaults_to_none_when_userclass_picker_is_active(self):
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class TestShape(LoadTestShape):
-            def tick(self):
-                run_time = self.get_run_time()
-                if run_time < 10:
-                    return 4, 4
-                else:
-                    return None
-
-        test_shape_instance = TestShape()
+        test_shape_instance = Shape1()
 
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
         self.environment.available_shape_classes = {"TestShape": test_shape_instance}
         self.environment.shape_class = test_shape_instance
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -681,27 +723,20 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertIsNone(self.environment.shape_class)
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_shape_class_is_updated_when_userclass_picker_is_active(self):
-        class User1(User):
-            pass
-
-        class TestShape(LoadTestShape):
-            def tick(self):
-                pass
-
-        test_shape_instance = TestShape()
+        test_shape_instance = NoopShape()
 
         self.environment.web_ui.userclass_picker_is_active = True
         self.environment.available_user_classes = {"User1": User1}
         self.environment.available_shape_classes = {"TestShape": test_shape_instance}
         self.environment.shape_class = None
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -715,42 +750,20 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(test_shape_instance, self.environment.shape_class)
         self.assertIsNotNone(test_shape_instance.runner)
 
-        # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        # the shape returns no tick, so the runner stops by itself
+        self._wait_for_runner_state(STATE_STOPPED)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_userclass_shapeclass_ignored_when_userclass_picker_is_inactive(self):
-        class User1(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class User2(User):
-            wait_time = constant(1)
-
-            @task
-            def t(self):
-                pass
-
-        class TestShape(LoadTestShape):
-            def tick(self):
-                run_time = self.get_run_time()
-                if run_time < 10:
-                    return 4, 4
-                else:
-                    return None
-
         self.environment.web_ui.userclass_picker_is_active = False
         self.environment.user_classes = [User1, User2]
         self.environment.available_user_classes = {"User1": User1, "User2": User2}
-        self.environment.available_shape_classes = {"TestShape": TestShape()}
+        self.environment.available_shape_classes = {"TestShape": Shape1()}
         self.environment.shape_class = None
 
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 5,
                 "spawn_rate": 5,
@@ -767,8 +780,8 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertIsNone(self.environment.shape_class)
 
         # stop
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stop")
         self.assertEqual(response.json()["message"], "Test stopped")
 
     def test_swarm_custom_arguments(self):
@@ -824,8 +837,8 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.environment.user_classes = [MyUser]
         self.environment.parsed_options = parsed_options
         self.environment.web_ui.parsed_options = parsed_options
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.session.post(
+            f"{self.url}/swarm",
             data={
                 "user_count": 1,
                 "spawn_rate": 1,
@@ -866,25 +879,18 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.environment.user_classes = [MyUser]
         self.environment.parsed_options = parsed_options
         self.environment.web_ui.parsed_options = parsed_options
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        response = self.session.post(
+            f"{self.url}/swarm",
             data={"user_count": 1, "spawn_rate": 1, "host": "", "my_argument": "42"},
         )
         self.assertEqual(200, response.status_code)
         self.assertEqual(42, my_dict["val"])
 
     def test_swarm_host_value_not_specified(self):
-        class MyUser(User):
-            wait_time = constant(1)
-
-            @task(1)
-            def my_task(self):
-                pass
-
-        self.environment.user_classes = [MyUser]
-        self.environment.web_ui.parsed_options = get_parser().parse_args()
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        self.environment.user_classes = [User1]
+        self.environment.web_ui.parsed_options = self._default_options()
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={"user_count": 5, "spawn_rate": 5},
         )
         self.assertEqual(200, response.status_code)
@@ -892,17 +898,10 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(self.environment.host, None)
 
     def test_swarm_run_time(self):
-        class MyUser(User):
-            wait_time = constant(1)
-
-            @task(1)
-            def my_task(self):
-                pass
-
-        self.environment.user_classes = [MyUser]
-        self.environment.web_ui.parsed_options = get_parser().parse_args()
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        self.environment.user_classes = [User1]
+        self.environment.web_ui.parsed_options = self._default_options()
+        response = self.session.post(
+            f"{self.url}/swarm",
             data={"user_count": 5, "spawn_rate": 5, "host": "https://localhost", "run_time": "1s"},
         )
         self.assertEqual(200, response.status_code)
@@ -910,22 +909,15 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(self.environment.host, "https://localhost")
         self.assertEqual(1, response.json()["run_time"])
         # wait for test to run
-        gevent.sleep(3)
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        self._wait_for_runner_state(STATE_STOPPED, timeout=5)
+        response = self.session.get(f"{self.url}/stats/requests")
         self.assertEqual("stopped", response.json()["state"])
 
     def test_swarm_run_time_invalid_input(self):
-        class MyUser(User):
-            wait_time = constant(1)
-
-            @task(1)
-            def my_task(self):
-                pass
-
-        self.environment.user_classes = [MyUser]
-        self.environment.web_ui.parsed_options = get_parser().parse_args()
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        self.environment.user_classes = [User1]
+        self.environment.web_ui.parsed_options = self._default_options()
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={"user_count": 5, "spawn_rate": 5, "host": "https://localhost", "run_time": "bad"},
         )
         self.assertEqual(200, response.status_code)
@@ -935,22 +927,14 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
             "Valid run_time formats are : 20, 20s, 3m, 2h, 1h20m, 3h30m10s, etc.", response.json()["message"]
         )
         # verify test was not started
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual("ready", response.json()["state"])
-        requests.get("http://127.0.0.1:%i/stats/reset" % self.web_port)
 
     def test_swarm_run_time_empty_input(self):
-        class MyUser(User):
-            wait_time = constant(1)
-
-            @task(1)
-            def my_task(self):
-                pass
-
-        self.environment.user_classes = [MyUser]
-        self.environment.web_ui.parsed_options = get_parser().parse_args()
-        response = requests.post(
-            "http://127.0.0.1:%i/swarm" % self.web_port,
+        self.environment.user_classes = [User1]
+        self.environment.web_ui.parsed_options = self._default_options()
+        response = self.client.post(
+            f"{self.url}/swarm",
             data={"user_count": 5, "spawn_rate": 5, "host": "https://localhost", "run_time": ""},
         )
 
@@ -959,85 +943,68 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.assertEqual(self.environment.host, "https://localhost")
 
         # verify test is running
-        gevent.sleep(1)
-        response = requests.get("http://127.0.0.1:%i/stats/requests" % self.web_port)
+        self._wait_for_runner_state(STATE_RUNNING)
+        response = self.client.get(f"{self.url}/stats/requests")
         self.assertEqual("running", response.json()["state"])
 
         # stop
-        response = requests.get("http://127.0.0.1:%i/stop" % self.web_port)
-
-    def test_host_value_from_user_class(self):
-        class MyUser(User):
-            host = "http://example.com"
-
-        self.environment.user_classes = [MyUser]
-        response = requests.get("http://127.0.0.1:%i/" % self.web_port)
-        self.assertEqual(200, response.status_code)
-        self.assertIn("http://example.com", response.content.decode("utf-8"))
-        self.assertNotIn("setting this will override the host on all User classes", response.content.decode("utf-8"))
+        response = self.client.get(f"{self.url}/stop")
+        self.assertEqual(response.json()["message"], "Test stopped")
 
-    def test_host_value_from_multiple_user_classes(self):
-        class MyUser(User):
+    def test_host_value_from_user_classes(self):
+        class ExampleUser(User):
             host = "http://example.com"
 
-        class MyUser2(User):
+        class ExampleUser2(User):
             host = "http://example.com"
 
-        self.environment.user_classes = [MyUser, MyUser2]
-        response = requests.get("http://127.0.0.1:%i/" % self.web_port)
-        self.assertEqual(200, response.status_code)
-        self.assertIn("http://example.com", response.content.decode("utf-8"))
-        self.assertNotIn("setting this will override the host on all User classes", response.content.decode("utf-8"))
-
-    def test_host_value_from_multiple_user_classes_different_hosts(self):
-        class MyUser(User):
+        class NoHostUser(User):
             host = None
 
-        class MyUser2(User):
-            host = "http://example.com"
-
-        self.environment.user_classes = [MyUser, MyUser2]
-        response = requests.get("http://127.0.0.1:%i/" % self.web_port)
-        self.assertEqual(200, response.status_code)
-        self.assertNotIn("http://example.com", response.content.decode("utf-8"))
+        override_warning = "setting this will override the host on all User classes"
+        # (user classes, expected in page, not expected in page)
+        cases = (
+            ([ExampleUser], "http://example.com", override_warning),
+            ([ExampleUser, ExampleUser2], "http://example.com", override_warning),
+            ([NoHostUser, ExampleUser], None, "http://example.com"),
+        )
+        for user_classes, expected, unexpected in cases:
+            with self.subTest(user_classes=[user_class.__name__ for user_class in user_classes]):
+                self.environment.user_classes = user_classes
+                response = self.client.get(f"{self.url}/")
+                self.assertEqual(200, response.status_code)
+                body = response.content.decode("utf-8")
+                if expected is not None:
+                    self.assertIn(expected, body)
+                self.assertNotIn(unexpected, body)
 
     def test_report_page(self):
         self.stats.log_request("GET", "/test", 120, 5612)
-        r = requests.get("http://127.0.0.1:%i/stats/report" % self.web_port)
+        r = self.client.get(f"{self.url}/stats/report")
 
-        d = pq(r.content.decode("utf-8"))
+        body = r.content.decode("utf-8")
 
         self.assertEqual(200, r.status_code)
-        self.assertIn('"host": "None"', str(d))
-        self.assertIn('"num_requests": 1', str(d))
-        self.assertIn('"is_report": true', str(d))
-        self.assertIn('"show_download_link": true', str(d))
+        self.assertIn('"host": "None"', body)
+        self.assertIn('"num_requests": 1', body)
+        self.assertIn('"is_report": true', body)
+        self.assertIn('"show_download_link": true', body)
 
     def test_report_page_empty_stats(self):
-        r = requests.get("http://127.0.0.1:%i/stats/report" % self.web_port)
+        r = self.client.get(f"{self.url}/stats/report")
         self.assertEqual(200, r.status_code)
 
     def test_report_download(self):
         self.stats.log_request("GET", "/test", 120, 5612)
-        r = requests.get("http://127.0.0.1:%i/stats/report?download=1" % self.web_port)
+        r = self.client.get(f"{self.url}/stats/report?download=1")
 
-        d = pq(r.content.decode("utf-8"))
+        body = r.content.decode("utf-8")
 
         self.assertEqual(200, r.status_code)
         self.assertIn("attachment", r.headers.get("Content-Disposition", ""))
-        self.assertIn('"show_download_link": false', str(d))
+        self.assertIn('"show_download_link": false', body)
 
     def test_report_host(self):
-        self.environment.host = "http://test.com"
-        self.stats.log_request("GET", "/test", 120, 5612)
-        r = requests.get("http://127.0.0.1:%i/stats/report" % self.web_port)
-
-        d = pq(r.content.decode("utf-8"))
-
-        self.assertEqual(200, r.status_code)
-        self.assertIn('"host": "http://test.com"', str(d))
-
-    def test_report_host2(self):
         class MyUser(User):
             host = "http://test2.com"
 
@@ -1045,29 +1012,29 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
             def my_task(self):
                 pass
 
-        self.environment.host = None
-        self.environment.user_classes = [MyUser]
         self.stats.log_request("GET", "/test", 120, 5612)
-        r = requests.get("http://127.0.0.1:%i/stats/report" % self.web_port)
-
-        d = pq(r.content.decode("utf-8"))
+        # (environment host, user classes, expected host in the report)
+        cases = (
+            ("http://test.com", [], "http://test.com"),
+            (None, [MyUser], "http://test2.com"),
+        )
+        for host, user_classes, expected_host in cases:
+            with self.subTest(host=host):
+                self.environment.host = host
+                self.environment.user_classes = user_classes
+                r = self.client.get(f"{self.url}/stats/report")
 
-        self.assertEqual(200, r.status_code)
-        self.assertIn('"host": "http://test2.com"', str(d))
+                self.assertEqual(200, r.status_code)
+                self.assertIn(f'"host": "{expected_host}"', r.content.decode("utf-8"))
 
     def test_report_exceptions(self):
-        try:
-            raise Exception("Test exception")
-        except Exception as e:
-            tb = e.__traceback__
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
-            self.runner.log_exception("local", str(e), "".join(traceback.format_tb(tb)))
+        self._log_test_exception("Test exception", times=2)
         self.stats.log_request("GET", "/test", 120, 5612)
-        r = requests.get("http://127.0.0.1:%i/stats/report" % self.web_port)
+        r = self.client.get(f"{self.url}/stats/report")
 
-        d = pq(r.content.decode("utf-8"))
+        body = r.content.decode("utf-8")
 
-        self.assertIn('exceptions_statistics": [{"count": 2', str(d))
+        self.assertIn('exceptions_statistics": [{"count": 2', body)
 
         # Prior to 088a98bf8ff4035a0de3becc8cd4e887d618af53, the "nodes" field for each exception in
         # "self.runner.exceptions" was accidentally mutated in "get_html_report" to a string.
@@ -1081,42 +1048,32 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.environment.locustfile = "locust.py"
         self.environment.host = "http://localhost"
 
-        response = requests.get("http://127.0.0.1:%i/stats/report" % self.web_port)
+        response = self.client.get(f"{self.url}/stats/report")
         self.assertEqual(200, response.status_code)
 
-        d = pq(response.content.decode("utf-8"))
+        body = response.content.decode("utf-8")
 
-        self.assertTrue(d("#root"))
-        self.assertIn('"locustfile": "locust.py"', str(d))
-        self.assertIn('"host": "http://localhost"', str(d))
+        self.assertIn('id="root"', body)
+        self.assertIn('"locustfile": "locust.py"', body)
+        self.assertIn('"host": "http://localhost"', body)
 
     def test_logs(self):
-        log_handler = LogReader()
-        log_handler.name = "log_reader"
-        log_handler.setLevel(logging.INFO)
-        logger = logging.getLogger("root")
-        logger.addHandler(log_handler)
         log_line = "some log info"
-        logger.info(log_line)
+        logging.getLogger("root").info(log_line)
 
-        response = requests.get("http://127.0.0.1:%i/logs" % self.web_port)
+        response = self.client.get(f"{self.url}/logs")
 
         self.assertIn(log_line, response.json().get("master"))
 
     def test_worker_logs(self):
-        log_handler = LogReader()
-        log_handler.name = "log_reader"
-        log_handler.setLevel(logging.INFO)
-        logger = logging.getLogger("root")
-        logger.addHandler(log_handler)
         log_line = "some log info"
-        logger.info(log_line)
+        logging.getLogger("root").info(log_line)
 
         worker_id = "123"
         worker_log_line = "worker log"
         self.environment.update_worker_logs({"worker_id": worker_id, "logs": [worker_log_line]})
 
-        response = requests.get("http://127.0.0.1:%i/logs" % self.web_port)
+        response = self.client.get(f"{self.url}/logs")
 
         self.assertIn(log_line, response.json().get("master"))
         self.assertIn(worker_log_line, response.json().get("workers").get(worker_id))
@@ -1166,8 +1123,8 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         self.environment.available_user_classes = {"User1": MyUser, "User2": MyUser2}
         self.environment.available_user_tasks = {"User1": MyUser.tasks, "User2": MyUser2.tasks}
 
-        requests.post(
-            "http://127.0.0.1:%i/user" % self.web_port,
+        self.client.post(
+            f"{self.url}/user",
             json={"user_class_name": "User1", "host": "http://localhost", "tasks": ["my_task_2"]},
         )
 
@@ -1177,18 +1134,21 @@ class TestWebUI(LocustTestCase, _HeaderCheckMixin):
         )
 
 
-class TestWebUIAuth(LocustTestCase):
+class TestWebUIAuth(_SessionMixin, _DefaultOptionsMixin, LocustTestCase):
+    _option_args = ["--web-login"]
+
     def setUp(self):
         super().setUp()
 
-        parser = get_parser(default_config_files=[])
-        self.environment.parsed_options = parser.parse_args(["--web-login"])
+        self.environment.parsed_options = self._default_options()
 
         self.web_ui = self.environment.create_web_ui("127.0.0.1", 0, web_login=True)
 
         self.web_ui.app.secret_key = "secret!"
-        gevent.sleep(0.01)
+        gevent.sleep(0)
         self.web_port = self.web_ui.server.server_port
+        self.url = f"http://127.0.0.1:{self.web_port}"
+        self.client = _TestClientSession(self.web_ui.app)
 
     def tearDown(self):
         super().tearDown()
@@ -1208,11 +1168,11 @@ class TestWebUIAuth(LocustTestCase):
 
         self.web_ui.login_manager.request_loader(load_user)
 
-        response = requests.get("http://127.0.0.1:%i" % self.web_port)
-        d = pq(response.content.decode("utf-8"))
+        response = self.client.get(self.url)
+        body = response.content.decode("utf-8")
 
-        self.assertNotIn("authArgs", str(d))
-        self.assertIn("templateArgs", str(d))
+        self.assertNotIn("authArgs", body)
+        self.assertIn("templateArgs", body)
 
     def test_index_with_web_login_enabled_no_user(self):
         def load_user():
@@ -1220,24 +1180,34 @@ class TestWebUIAuth(LocustTestCase):
 
         self.web_ui.login_manager.user_loader(load_user)
 
-        response = requests.get("http://127.0.0.1:%i" % self.web_port)
-        d = pq(response.content.decode("utf-8"))
+        response = self.session.get(self.url)
+        body = response.content.decode("utf-8")
 
         # asserts auth page is returned
-        self.assertIn("authArgs", str(d))
+        self.assertIn("authArgs", body)
 
 
-class TestWebUIWithTLS(LocustTestCase):
-    def setUp(self):
-        super().setUp()
+class TestWebUIWithTLS(_SessionMixin, LocustTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # generating the key pair is the expensive part, so do it once for all tests in the class
         tls_cert, tls_key = create_tls_cert("127.0.0.1")
-        self.tls_cert_file = NamedTemporaryFile(delete=False)
-        self.tls_key_file = NamedTemporaryFile(delete=False)
-        with open(self.tls_cert_file.name, "w") as f:
+        cls.tls_cert_file = NamedTemporaryFile(delete=False)
+        cls.tls_key_file = NamedTemporaryFile(delete=False)
+        with open(cls.tls_cert_file.name, "w") as f:
             f.write(tls_cert.decode())
-        with open(self.tls_key_file.name, "w") as f:
+        with open(cls.tls_key_file.name, "w") as f:
             f.write(tls_key.decode())
 
+    @classmethod
+    def tearDownClass(cls):
+        os.unlink(cls.tls_cert_file.name)
+        os.unlink(cls.tls_key_file.name)
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
         parser = get_parser(default_config_files=[])
         options = parser.parse_args(
             [
@@ -1250,25 +1220,24 @@ class TestWebUIWithTLS(LocustTestCase):
         self.runner = Runner(self.environment)
         self.stats = self.runner.stats
         self.web_ui = self.environment.create_web_ui("127.0.0.1", 0, tls_cert=options.tls_cert, tls_key=options.tls_key)
-        gevent.sleep(0.01)
+        gevent.sleep(0)
         self.web_port = self.web_ui.server.server_port
+        self.url = f"https://127.0.0.1:{self.web_port}"
 
     def tearDown(self):
         super().tearDown()
         self.web_ui.stop()
         self.runner.quit()
-        os.unlink(self.tls_cert_file.name)
-        os.unlink(self.tls_key_file.name)
 
     def test_index_with_https(self):
         # Suppress only the single warning from urllib3 needed.
         from urllib3.exceptions import InsecureRequestWarning
 
         requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
-        self.assertEqual(200, requests.get("https://127.0.0.1:%i/" % self.web_port, verify=False).status_code)
+        self.assertEqual(200, self.session.get(f"{self.url}/", verify=False).status_code)
 
 
-class TestWebUIFullHistory(LocustTestCase, _HeaderCheckMixin):
+class TestWebUIFullHistory(_SessionMixin, LocustTestCase, _HeaderCheckMixin):
     STATS_BASE_DIR = "csv_output"
     STATS_BASE_NAME = "web_test"
     STATS_FILENAME = f"{STATS_BASE_NAME}_stats.csv"
@@ -1292,8 +1261,9 @@ class TestWebUIFullHistory(LocustTestCase, _HeaderCheckMixin):
         )
         self.web_ui = self.environment.create_web_ui("127.0.0.1", 0, stats_csv_writer=self.stats_csv_writer)
         self.web_ui.app.view_functions["locust.request_stats"].clear_cache()
-        gevent.sleep(0.01)
+        gevent.sleep(0)
         self.web_port = self.web_ui.server.server_port
+        self.url = f"http://127.0.0.1:{self.web_port}"
 
     def tearDown(self):
         super().tearDown()
@@ -1321,7 +1291,7 @@ class TestWebUIFullHistory(LocustTestCase, _HeaderCheckMixin):
         self.stats_csv_writer.stats_history_flush()
         gevent.kill(greenlet)
 
-        response = requests.get("http://127.0.0.1:%i/stats/requests_full_history/csv" % self.web_port)
+        response = self.session.get(f"{self.url}/stats/requests_full_history/csv")
         self.assertEqual(200, response.status_code)
         self._check_csv_headers(response.headers, "requests_full_history")
         self.assertIn("Content-Length", response.headers)
@@ -178,6 +178,7 @@ class LocustTestCase(unittest.TestCase):
         # Prevent args passed to test runner from being passed to Locust
         del sys.argv[1:]
 
+        self._original_events = locust.events
         locust.events = Events()
         self.environment = Environment(events=locust.events, catch_exceptions=False)
         self.runner = self.environment.create_local_runner()
@@ -209,6 +210,9 @@ class LocustTestCase(unittest.TestCase):
         [logging.root.addHandler(h) for h in self._root_log_handlers]
         self.mocked_log.reset()
 
+        # drop any listeners the test registered, so they don't leak into tests that use the global events
+        locust.events = self._original_events
+
         clear_all_functools_lru_cache()
 
 
@@ -1,5 +1,7 @@
 import functools
-from time import time
+from time import monotonic
+
+_MISSING = object()
 
 
 def memoize(timeout, dynamic_timeout=False):
@@ -9,27 +11,31 @@ def memoize(timeout, dynamic_timeout=False):
     If dynamic_timeout is set, the cache timeout is doubled if the cached function
     takes longer time to run than the timeout time
     """
-    cache = {"timeout": timeout}
 
     def decorator(func):
+        result = _MISSING
+        expires = 0.0
+        current_timeout = timeout
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start = time()
-            if (not "time" in cache) or (start - cache["time"] > cache["timeout"]):
+            nonlocal result, expires, current_timeout
+            start = monotonic()
+            if result is _MISSING or start > expires:
                 # cache miss
-                cache["result"] = func(*args, **kwargs)
-                cache["time"] = time()
-                if dynamic_timeout and cache["time"] - start > cache["timeout"]:
-                    cache["timeout"] *= 2
-            return cache["result"]
+                result = func(*args, **kwargs)
+                now = monotonic()
+                if dynamic_timeout and now - start > current_timeout:
+                    current_timeout *= 2
+                expires = now + current_timeout
+            return result
 
         def clear_cache():
-            if "time" in cache:
-                del cache["time"]
-            if "result" in cache:
-                del cache["result"]
+            nonlocal result
+            result = _MISSING
 
         wrapper.clear_cache = clear_cache
+        wrapper.cache_clear = clear_cache
         return wrapper
 
     return decorator
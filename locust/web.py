@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import csv
+import gzip
 import itertools
 import json
 import logging
 import mimetypes
 import os.path
+import socket
 from functools import wraps
 from io import StringIO
 from json import dumps
@@ -42,6 +44,11 @@ from .util.cache import memoize
 from .util.date import format_safe_timestamp
 from .util.timespan import parse_timespan
 
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None  # type: ignore[assignment]
+
 if TYPE_CHECKING:
     from .env import Environment
 
@@ -53,6 +60,34 @@ DEFAULT_CACHE_TIME = 2.0
 HOST_IS_REQUIRED = False
 
 
+def _json_response(data: dict[str, Any]) -> Response:
+    """Like flask.jsonify, but serializes straight to bytes using orjson when it is installed"""
+    if orjson is None:
+        return jsonify(data)
+    return Response(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS), mimetype="application/json")
+
+
+def _conditional_response(view_func):
+    """
+    Tags the view's response with an ETag and answers requests whose If-None-Match already
+    matches it with 304 Not Modified, so pollers don't download unchanged (cached) data again
+    """
+
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        response = view_func(*args, **kwargs)
+        etag, _ = response.get_etag()
+        if etag is None:
+            # memoized views hand out the same response object, so this only hashes each new body once
+            response.add_etag()
+            etag, _ = response.get_etag()
+        if etag in request.if_none_match:
+            return Response(status=304, headers={"ETag": response.headers["ETag"]})
+        return response
+
+    return wrapper
+
+
 class InputField(TypedDict, total=False):
     label: str
     name: str
@@ -212,6 +247,7 @@ class WebUI:
         @self.auth_required_if_enabled
         def swarm() -> Response:
             assert request.method == "POST"
+            form = request.form
 
             # Loading UserClasses & ShapeClasses if Locust is running with UserClass Picker
             if self.userclass_picker_is_active:
@@ -220,7 +256,7 @@ class WebUI:
                     return jsonify({"success": False, "message": err_msg, "host": environment.host})
 
                 # Getting Specified User Classes
-                form_data_user_class_names = request.form.getlist("user_classes")
+                form_data_user_class_names = form.getlist("user_classes")
 
                 # Updating UserClasses
                 if form_data_user_class_names:
@@ -247,7 +283,7 @@ class WebUI:
                 self._update_user_classes(user_classes)
 
                 # Updating ShapeClass if specified in WebUI Form
-                form_data_shape_class_name = request.form.get("shape_class", "Default")
+                form_data_shape_class_name = form.get("shape_class", "Default")
                 if form_data_shape_class_name == "Default":
                     self._update_shape_class(None)
                 else:
@@ -257,7 +293,7 @@ class WebUI:
             run_time = None
             user_count = None
             spawn_rate = None
-            for key, value in request.form.items():
+            for key, value in form.items():
                 match key:
                     case "user_count":  # if we just renamed this field to "users" we wouldn't need this
                         user_count = int(value)
@@ -267,11 +303,11 @@ class WebUI:
                         parsed_options_dict[key] = spawn_rate
                     case "host":
                         # Replace < > to guard against XSS
-                        environment.host = str(request.form["host"]).replace("<", "").replace(">", "")
+                        environment.host = str(value).replace("<", "").replace(">", "")
                         parsed_options_dict[key] = environment.host
                     case "user_classes":
                         # Set environment.parsed_options.user_classes to the selected user_classes
-                        parsed_options_dict[key] = request.form.getlist("user_classes")
+                        parsed_options_dict[key] = form.getlist("user_classes")
                     case "run_time":
                         if not value:
                             continue
@@ -283,7 +319,7 @@ class WebUI:
                             logger.error(err_msg)
                             return jsonify({"success": False, "message": err_msg, "host": environment.host})
                     case "profile":
-                        environment.profile = str(request.form["profile"]) or None
+                        environment.profile = str(value) or None
                         parsed_options_dict[key] = environment.profile
                     case _ if key in parsed_options_dict:
                         # update the value in environment.parsed_options, but dont change the type.
@@ -297,7 +333,7 @@ class WebUI:
                             if "," in value:
                                 value_as_list = value.split(",")
                             else:
-                                value_as_list = request.form.getlist(key)
+                                value_as_list = form.getlist(key)
                             if all(isinstance(x, int) for x in parsed_options_value):
                                 parsed_options_dict[key] = list(map(int, value_as_list))
                             else:
@@ -402,6 +438,12 @@ class WebUI:
 
             response = make_response(csv_data)
             response.headers["Content-type"] = "text/csv"
+            response.vary.add("Accept-Encoding")
+            # "in" would also match an explicit refusal (gzip;q=0), so go by the quality value
+            if request.accept_encodings["gzip"] > 0:
+                # csv rows are very repetitive, so even the fastest compression levels shrink them a lot
+                response.set_data(gzip.compress(response.get_data(), compresslevel=3))
+                response.headers["Content-Encoding"] = "gzip"
             response.headers["Content-disposition"] = (
                 f"attachment;filename={_download_csv_suggest_file_name(filename_prefix)}"
             )
@@ -447,6 +489,7 @@ class WebUI:
 
         @app_blueprint.route("/stats/requests")
         @self.auth_required_if_enabled
+        @_conditional_response
         @memoize(timeout=DEFAULT_CACHE_TIME, dynamic_timeout=True)
         def request_stats() -> Response:
             _stats: list[dict[str, Any]] = []
@@ -468,7 +511,7 @@ class WebUI:
                 if isinstance(environment.runner, MasterRunner):
                     report.update({"workers": []})
 
-                return jsonify(report)
+                return _json_response(report)
 
             # Truncate the total number of stats and errors displayed since a large number of rows will cause the app
             # to render extremely slowly. Aggregate stats should be preserved.
@@ -489,11 +532,12 @@ class WebUI:
                 report["total_rps"] = total_stats["total_rps"]
                 report["total_fail_per_sec"] = total_stats["total_fail_per_sec"]
                 report["fail_ratio"] = environment.runner.stats.total.fail_ratio
+                current_percentiles = environment.runner.stats.total.get_current_response_time_percentiles(
+                    stats.PERCENTILES_TO_CHART
+                ) or [None] * len(stats.PERCENTILES_TO_CHART)
                 report["current_response_time_percentiles"] = {
-                    f"response_time_percentile_{percentile}": environment.runner.stats.total.get_current_response_time_percentile(
-                        percentile
-                    )
-                    for percentile in stats.PERCENTILES_TO_CHART
+                    f"response_time_percentile_{percentile}": value
+                    for percentile, value in zip(stats.PERCENTILES_TO_CHART, current_percentiles)
                 }
 
             if isinstance(environment.runner, MasterRunner):
@@ -514,7 +558,7 @@ class WebUI:
             report["state"] = environment.runner.state
             report["user_count"] = environment.runner.user_count
 
-            return jsonify(report)
+            return _json_response(report)
 
         @app_blueprint.route("/exceptions")
         @self.auth_required_if_enabled
@@ -631,6 +675,9 @@ class WebUI:
             logger.addFilter(RewriteFilter())
             self.server = pywsgi.WSGIServer((self.host, self.port), self.app, log=None, error_log=logger)
 
+        # bind up front so Nagle can be disabled on the listener, accepted connections inherit the option
+        self.server.init_socket()
+        self.server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         self.server.serve_forever()
 
     def stop(self):